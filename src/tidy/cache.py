@@ -0,0 +1,134 @@
+"""On-disk cache of tidy results keyed by source content and options."""
+
+import hashlib
+import marshal
+import os
+import tempfile
+from functools import cache
+
+CACHE_DIR = ".tidy_cache"
+
+# Part of every cache key. Bump it whenever tidy's output for a given source
+# and options changes, so entries written by older code are never replayed
+CACHE_VERSION = 1
+
+# Entries beyond this total size are pruned, least recently used first
+MAX_CACHE_BYTES = 128 * 1024 * 1024
+
+
+@cache
+def tidy_version() -> str:
+    """Return the installed tidy version, part of every cache key."""
+    # importlib.metadata is slow to import, only load it once a key is needed
+    from importlib import metadata
+
+    try:
+        return metadata.version("tidy")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def cache_key(source: bytes, options: tuple) -> str:
+    """Return the cache key for source bytes processed with the given options."""
+    digest = hashlib.blake2b(
+        repr((CACHE_VERSION, tidy_version(), options)).encode("utf-8")
+    )
+    digest.update(b"\0")
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def prepare(cache_dir: str) -> None:
+    """Create the cache directory, ignored by git so it is never committed."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        gitignore = os.path.join(cache_dir, ".gitignore")
+        if not os.path.exists(gitignore):
+            with open(gitignore, "w", encoding="utf-8") as f:
+                f.write("# Automatically created by tidy\n*\n")
+    except OSError:
+        # Caching is best effort, never fail the run because of it
+        pass
+
+
+def _entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def load(cache_dir: str, key: str) -> tuple[tuple[int, ...], str | None] | None:
+    """Return the cached (counts, new_code) entry for a key, if any."""
+    path = _entry_path(cache_dir, key)
+
+    try:
+        with open(path, "rb") as f:
+            counts, new_code = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        # Missing or unreadable entries are plain cache misses
+        return None
+
+    # The modification time records the last use, for prune()
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return counts, new_code
+
+
+def store(
+    cache_dir: str,
+    key: str,
+    counts: tuple[int, ...],
+    new_code: str | None,
+) -> None:
+    """Store the result for a key; new_code is None when nothing changed."""
+    path = _entry_path(cache_dir, key)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent workers never see a
+        # partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump((counts, new_code), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Caching is best effort, never fail the run because of it
+        pass
+
+
+def prune(cache_dir: str, max_bytes: int = MAX_CACHE_BYTES) -> None:
+    """Delete the least recently used entries until the cache fits max_bytes."""
+    entries = []
+    total = 0
+
+    try:
+        with os.scandir(cache_dir) as buckets:
+            for bucket in buckets:
+                if not bucket.is_dir(follow_symlinks=False):
+                    continue
+
+                with os.scandir(bucket.path) as files:
+                    for entry in files:
+                        stat = entry.stat(follow_symlinks=False)
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+    except OSError:
+        return
+
+    if total <= max_bytes:
+        return
+
+    entries.sort()
+
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+        total -= size
+        if total <= max_bytes:
+            break
@@ -0,0 +1,395 @@
+"""Fast paths for removals using the stdlib ast and tokenize modules.
+
+Removing print, assert and log statements or docstrings does not need the
+comment fidelity libcst provides for the removed node itself. The stdlib
+parser is much cheaper, and splicing the original source by line ranges keeps
+every untouched line byte-for-byte identical. Comments are single tokens, so
+removing them only needs one tokenize pass over the source.
+"""
+
+import ast
+import io
+import re
+import tokenize
+from collections.abc import Callable
+
+# Inline comments kept unless all inline comments are removed
+PRESERVE_RE = re.compile(r"noqa|type:|pragma")
+
+# Shebang, vim modeline or coding declaration, removed as header comments
+HEADER_RE = re.compile(r"#!|# vim:|.*coding", re.IGNORECASE)
+
+# Names whose level methods are treated as logging calls
+LOG_BASES = frozenset({"log", "logger", "logging"})
+
+# Every level method, removed when no levels are selected
+LOG_LEVELS = frozenset(
+    {
+        "trace",
+        "debug",
+        "info",
+        "warning",
+        "success",
+        "error",
+        "exception",
+        "critical",
+    }
+)
+
+_DOCSTRING_OWNERS = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Fields holding statement lists, per node type. The parser never subclasses
+# node types, so a dict lookup on the exact type replaces field inspection
+_STATEMENT_FIELDS: dict[type[ast.AST], tuple[str, ...]] = {
+    ast.Module: ("body",),
+    ast.FunctionDef: ("body",),
+    ast.AsyncFunctionDef: ("body",),
+    ast.ClassDef: ("body",),
+    ast.For: ("body", "orelse"),
+    ast.AsyncFor: ("body", "orelse"),
+    ast.While: ("body", "orelse"),
+    ast.If: ("body", "orelse"),
+    ast.With: ("body",),
+    ast.AsyncWith: ("body",),
+    ast.Try: ("body", "orelse", "finalbody"),
+    ast.TryStar: ("body", "orelse", "finalbody"),
+    ast.ExceptHandler: ("body",),
+    ast.match_case: ("body",),
+}
+
+# Fields holding except handlers or match cases, whose bodies are statements
+_CLAUSE_FIELDS: dict[type[ast.AST], str] = {
+    ast.Try: "handlers",
+    ast.TryStar: "handlers",
+    ast.Match: "cases",
+}
+
+
+def _line_ending(line: str) -> str:
+    return line[len(line.rstrip("\r\n")) :]
+
+
+def _is_print(func: ast.expr) -> bool:
+    return type(func) is ast.Name and func.id == "print"
+
+
+def _log_call_matcher(log_levels: frozenset[str]) -> Callable[[ast.expr], bool]:
+    def is_log_call(func: ast.expr) -> bool:
+        return (
+            type(func) is ast.Attribute
+            and func.attr in log_levels
+            and type(func.value) is ast.Name
+            and func.value.id in LOG_BASES
+        )
+
+    return is_log_call
+
+
+class _StatementCollector:
+    """Visitor collecting the line ranges of statements to remove.
+
+    Statements only ever nest inside other statements, so the walk follows
+    statement lists and never descends into expressions.
+    """
+
+    def __init__(
+        self,
+        lines: list[str],
+        remove_prints: bool = False,
+        remove_docstrings: bool = False,
+        remove_asserts: bool = False,
+        remove_logs: bool = False,
+        log_levels: set[str] | None = None,
+    ):
+        self.lines = lines
+        self.remove_docstrings = remove_docstrings
+        self.remove_asserts = remove_asserts
+
+        # (category, matcher) for the enabled call statement removals only, so
+        # disabled ones cost nothing per statement
+        self.call_matchers: list[tuple[str, Callable[[ast.expr], bool]]] = []
+        if remove_prints:
+            self.call_matchers.append(("prints", _is_print))
+        if remove_logs:
+            levels = frozenset(log_levels) if log_levels else LOG_LEVELS
+            self.call_matchers.append(("logs", _log_call_matcher(levels)))
+
+        self.counts = dict.fromkeys(
+            ("prints", "comments", "docstrings", "asserts", "logs"), 0
+        )
+        # (start, end, replacement) as 0-based half-open line ranges
+        self.spans: list[tuple[int, int, str]] = []
+
+    def visit(self, node: ast.AST) -> None:
+        node_type = type(node)
+
+        for field in _STATEMENT_FIELDS.get(node_type, ()):
+            body = getattr(node, field)
+            if body:
+                self._strip_body(
+                    body,
+                    allow_docstring=field == "body" and node_type in _DOCSTRING_OWNERS,
+                    is_module=node_type is ast.Module,
+                )
+
+                for stmt in body:
+                    self.visit(stmt)
+
+        clause_field = _CLAUSE_FIELDS.get(node_type)
+        if clause_field is not None:
+            for clause in getattr(node, clause_field):
+                self.visit(clause)
+
+    def _strip_body(
+        self,
+        body: list[ast.stmt],
+        allow_docstring: bool,
+        is_module: bool,
+    ) -> None:
+        spans = []
+
+        # A docstring can only be the first statement, check that one alone
+        has_docstring = (
+            allow_docstring and self.remove_docstrings and self._is_docstring(body[0])
+        )
+
+        for index, stmt in enumerate(body):
+            if index == 0 and has_docstring:
+                category = "docstrings"
+            else:
+                category = self._category(stmt)
+
+            if category is None or not self._spans_whole_lines(stmt):
+                continue
+
+            # A backslash continuation puts the statement on the logical line
+            # of the one before it, removing its lines would break that line
+            if index > 0 and self._continues_line(body[index - 1], stmt):
+                continue
+
+            self.counts[category] += 1
+            start = stmt.lineno - 1
+
+            # Comments and blank lines above a block's docstring go with it,
+            # the module header is kept
+            if category == "docstrings" and not is_module:
+                while start > 0 and self._is_trivia(self.lines[start - 1]):
+                    start -= 1
+
+            spans.append((start, stmt.end_lineno, ""))
+
+        # A block can't be empty, put a pass where its first statement was
+        if len(spans) == len(body) and not is_module:
+            start, end, _ = spans[0]
+            first_line = self.lines[body[0].lineno - 1]
+            indent = first_line[: len(first_line) - len(first_line.lstrip())]
+            newline = _line_ending(self.lines[end - 1])
+            spans[0] = (start, end, f"{indent}pass{newline}")
+
+        self.spans.extend(spans)
+
+    def _category(self, stmt: ast.stmt) -> str | None:
+        stmt_type = type(stmt)
+
+        if stmt_type is ast.Assert:
+            return "asserts" if self.remove_asserts else None
+
+        if stmt_type is ast.Expr and type(stmt.value) is ast.Call:
+            func = stmt.value.func
+
+            for category, matches in self.call_matchers:
+                if matches(func):
+                    return category
+
+        return None
+
+    def _is_docstring(self, stmt: ast.stmt) -> bool:
+        if not (
+            type(stmt) is ast.Expr
+            and type(stmt.value) is ast.Constant
+            and type(stmt.value.value) in (str, bytes)
+        ):
+            return False
+
+        # Like libcst, only a single literal counts, not "implicit" "concatenation"
+        segment = self._segment(stmt.value)
+        try:
+            tokens = tokenize.generate_tokens(io.StringIO(segment).readline)
+            return sum(token.type == tokenize.STRING for token in tokens) == 1
+        except (tokenize.TokenError, SyntaxError):
+            return False
+
+    def _spans_whole_lines(self, stmt: ast.stmt) -> bool:
+        # Offsets are in UTF-8 bytes
+        before = self.lines[stmt.lineno - 1].encode("utf-8")[: stmt.col_offset]
+        if before.strip():
+            return False
+
+        after = self.lines[stmt.end_lineno - 1].encode("utf-8")[stmt.end_col_offset :]
+        after = after.strip()
+        if after.startswith(b";"):
+            after = after[1:].lstrip()
+
+        return not after or after.startswith(b"#")
+
+    def _continues_line(self, previous: ast.stmt, stmt: ast.stmt) -> bool:
+        if previous.end_lineno >= stmt.lineno:
+            return False
+
+        # Only a semicolon, a comment or a continuation can follow a statement
+        rest = self.lines[previous.end_lineno - 1].encode("utf-8")
+        rest = rest[previous.end_col_offset :].strip()
+        if rest.startswith(b";"):
+            rest = rest[1:].lstrip()
+
+        return rest.endswith(b"\\") and not rest.startswith(b"#")
+
+    def _segment(self, node: ast.expr) -> str:
+        first = self.lines[node.lineno - 1].encode("utf-8")
+        if node.lineno == node.end_lineno:
+            return first[node.col_offset : node.end_col_offset].decode("utf-8")
+
+        last = self.lines[node.end_lineno - 1].encode("utf-8")
+        return "".join(
+            [
+                first[node.col_offset :].decode("utf-8"),
+                *self.lines[node.lineno : node.end_lineno - 1],
+                last[: node.end_col_offset].decode("utf-8"),
+            ]
+        )
+
+    @staticmethod
+    def _is_trivia(line: str) -> bool:
+        stripped = line.strip()
+        return not stripped or stripped.startswith("#")
+
+
+def fast_strip_statements(
+    source_code: str,
+    remove_prints: bool = False,
+    remove_docstrings: bool = False,
+    remove_asserts: bool = False,
+    remove_logs: bool = False,
+    log_levels: set[str] | None = None,
+) -> tuple[str, dict[str, int]] | None:
+    """Remove whole statements and return the new source with removal counts.
+
+    Returns None when the source can't be parsed by the running interpreter,
+    so the caller can fall back to libcst.
+    """
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        return None
+
+    # Split on the same line endings the parser recognises, unlike splitlines()
+    lines = io.StringIO(source_code, newline="").readlines()
+
+    collector = _StatementCollector(
+        lines,
+        remove_prints=remove_prints,
+        remove_docstrings=remove_docstrings,
+        remove_asserts=remove_asserts,
+        remove_logs=remove_logs,
+        log_levels=log_levels,
+    )
+    collector.visit(tree)
+
+    if not collector.spans:
+        return source_code, collector.counts
+
+    pieces = []
+    position = 0
+
+    for start, end, replacement in sorted(collector.spans):
+        pieces.extend(lines[position:start])
+        pieces.append(replacement)
+        position = end
+
+    pieces.extend(lines[position:])
+    new_code = "".join(pieces)
+
+    # Match libcst: keep a lone newline for an emptied file, and don't add a
+    # final newline the source didn't have
+    source_newline = _line_ending(lines[-1])
+    if not new_code:
+        new_code = source_newline
+    elif not source_newline:
+        new_code = new_code[: len(new_code) - len(_line_ending(new_code))]
+
+    # Never write out a file that no longer parses, let libcst handle it
+    try:
+        ast.parse(new_code)
+    except SyntaxError:
+        return None
+
+    return new_code, collector.counts
+
+
+def fast_strip_comments(
+    source_code: str,
+    comment_options: dict | None = None,
+) -> tuple[str, dict[str, int]] | None:
+    """Remove comments and return the new source with removal counts.
+
+    Mirrors the libcst comment removers: only the comment text is removed,
+    except for header comments, which are removed with their line when
+    standalone comments are kept. Returns None when the source can't be
+    parsed by the running interpreter, so the caller can fall back to libcst.
+    """
+    comment_options = comment_options or {}
+    remove_all = comment_options.get("all", False)
+    remove_inline = remove_all or comment_options.get("inline", False)
+    remove_default = comment_options.get("default", False)
+    remove_leading = remove_all or comment_options.get("leading", False)
+    remove_header = comment_options.get("header", False)
+
+    # Only files the parser accepts are touched, like with libcst
+    try:
+        ast.parse(source_code)
+    except SyntaxError:
+        return None
+
+    lines = io.StringIO(source_code, newline="").readlines()
+    counts = dict.fromkeys(("prints", "comments", "docstrings", "asserts", "logs"), 0)
+    in_header = True
+
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(source_code, newline="").readline)
+
+        for token in tokens:
+            if token.type != tokenize.COMMENT:
+                if token.type != tokenize.NL:
+                    in_header = False
+                continue
+
+            row, col = token.start
+            line = lines[row - 1]
+
+            if line[:col].strip():
+                remove = remove_inline or (
+                    remove_default and not PRESERVE_RE.search(token.string)
+                )
+            elif remove_leading:
+                remove = True
+            elif remove_header and in_header and HEADER_RE.match(token.string):
+                # The header keeps no blank line in place of the comment
+                counts["comments"] += 1
+                lines[row - 1] = ""
+                continue
+            else:
+                remove = False
+
+            if remove:
+                counts["comments"] += 1
+                lines[row - 1] = line[:col] + line[token.end[1] :]
+    except (tokenize.TokenError, SyntaxError):
+        return None
+
+    new_code = "".join(lines)
+
+    # Match libcst: an emptied file keeps a final newline if it had one
+    if not new_code:
+        new_code = _line_ending(source_code)
+
+    return new_code, counts
@@ -1,36 +1,147 @@
 """Main entry point for the tidy CLI."""
 
 import argparse
+import multiprocessing
 import os
+import queue
 import sys
+import threading
+from collections.abc import Iterable, Iterator
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import libcst as cst
+from tidy import cache
+from tidy.fast import LOG_LEVELS, fast_strip_comments, fast_strip_statements
 
-from tidy.transformers import (
-    AssertRemover,
-    DocstringRemover,
-    HeaderCommentRemover,
-    InlineCommentRemover,
-    LeadingCommentRemover,
-    LogRemover,
-    PrintRemover,
-)
+if TYPE_CHECKING:
+    import libcst as cst
 
+# Below this many files a worker pool costs more to start than it saves
+MIN_FILES_FOR_POOL = 16
 
-def find_python_files(start_dir: str) -> list[str]:
-    """Recursively find all .py files, excluding specified directories."""
-    skip_dirs = {".git", ".venv", "venv", "__pycache__"}
-    python_files = []
+# process_file options for the current run, set once per worker
+_worker_options: dict = {}
 
-    for root, dirs, files in os.walk(start_dir):
-        # Remove skip directories from in-place traversal
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
 
-        for file in files:
-            if file.endswith(".py"):
-                python_files.append(os.path.join(root, file))
+def find_python_files(start_dir: str) -> Iterator[str]:
+    """Recursively yield all .py files, excluding specified directories."""
+    skip_dirs = {".git", ".venv", "venv", "__pycache__", cache.CACHE_DIR}
+    pending_dirs = [start_dir]
 
-    return python_files
+    while pending_dirs:
+        try:
+            entries = os.scandir(pending_dirs.pop())
+        except OSError:
+            # Like os.walk, silently skip directories we can't list
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Don't follow symlinked directories, as os.walk doesn't
+                    if entry.name not in skip_dirs and not entry.is_symlink():
+                        pending_dirs.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    yield entry.path
+
+
+def unique_files(file_paths: Iterable[str]) -> list[str]:
+    """Return the paths that don't point to the same file as an earlier one.
+
+    Symlinks and hard links reach one file through several paths. Files are
+    read ahead of earlier ones being written, so each must be processed once.
+    """
+    seen = set()
+    unique = []
+
+    for file_path in file_paths:
+        try:
+            info = os.stat(file_path)
+        except OSError:
+            # Let process_file skip it like any other unreadable file
+            unique.append(file_path)
+            continue
+
+        file_id = (info.st_dev, info.st_ino)
+        if file_id not in seen:
+            seen.add(file_id)
+            unique.append(file_path)
+
+    return unique
+
+
+def parse_module(source_code: str) -> "cst.Module":
+    """Parse a module with libcst, for sources the fast paths can't handle."""
+    # Imported on first use, runs that never need libcst don't pay its import
+    import libcst as cst
+
+    return cst.parse_module(source_code)
+
+
+def read_sources(
+    file_paths: list[str],
+    max_pending: int,
+) -> Iterator[tuple[str, bytes | None]]:
+    """Yield (path, contents) pairs, in order, read ahead by a background thread.
+
+    Reading overlaps with processing, while the bounded queue caps how far the
+    reader runs ahead. Contents are None for files that couldn't be read.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+
+    def read_all() -> None:
+        for file_path in file_paths:
+            try:
+                pending.put((file_path, Path(file_path).read_bytes()))
+            except OSError:
+                pending.put((file_path, None))
+
+    threading.Thread(target=read_all, daemon=True).start()
+
+    for _ in file_paths:
+        yield pending.get()
+
+
+def write_source(file_path: str, data: bytes) -> None:
+    """Overwrite a file's contents in place with a single write.
+
+    The file keeps its inode, so hard links, symlinks, owner, mode and extended
+    attributes are all preserved. The old contents are only truncated after
+    the new ones are written, so the file is never seen empty.
+    """
+    with open(file_path, "r+b") as f:
+        f.write(data)
+        f.truncate()
+
+
+def required_substrings(
+    remove_prints: bool = False,
+    remove_comments: bool = False,
+    remove_docstrings: bool = False,
+    remove_asserts: bool = False,
+    remove_logs: bool = False,
+) -> tuple[bytes, ...]:
+    """Return substrings of which at least one must occur for a file to change.
+
+    The substrings are ASCII, so they can be searched for in UTF-8 source bytes.
+    """
+    needles = []
+
+    if remove_prints:
+        needles.append(b"print")
+    if remove_comments:
+        needles.append(b"#")
+    if remove_docstrings:
+        # Any string literal can be a docstring, not only triple-quoted ones
+        needles.extend((b'"', b"'"))
+    if remove_asserts:
+        needles.append(b"assert")
+    if remove_logs:
+        # Covers log, logger and logging, whatever spacing precedes the dot
+        needles.append(b"log")
+
+    return tuple(needles)
 
 
 def process_file(
@@ -42,105 +153,156 @@ def process_file(
     remove_logs: bool = False,
     comment_options: dict = None,
     log_levels: set[str] = None,
+    cache_dir: str | None = None,
+    source: bytes | None = None,
 ) -> tuple[int, int, int, int, int]:
-    """Process a single file and return counts of removed items."""
-    prints_removed = 0
-    comments_removed = 0
-    docstrings_removed = 0
-    asserts_removed = 0
-    logs_removed = 0
+    """Process a single file and return counts of removed items.
 
-    if comment_options is None:
-        comment_options = {}
+    When cache_dir is given, results are looked up and stored there so that
+    unchanged files are not parsed again on later runs. When source is given,
+    it is used as the file's contents instead of reading it again.
+    """
+    counts = dict.fromkeys(("prints", "comments", "docstrings", "asserts", "logs"), 0)
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            source_code = f.read()
+        if source is None:
+            source = Path(file_path).read_bytes()
 
-        module = cst.parse_module(source_code)
+        # A plain substring scan is far cheaper than parsing a file we won't
+        # touch, and runs on the raw bytes so skipped files aren't even decoded
+        needles = required_substrings(
+            remove_prints,
+            remove_comments,
+            remove_docstrings,
+            remove_asserts,
+            remove_logs,
+        )
+        if not any(needle in source for needle in needles):
+            return (0, 0, 0, 0, 0)
+
+        if cache_dir is not None:
+            key = cache.cache_key(
+                source,
+                (
+                    remove_prints,
+                    remove_comments,
+                    remove_docstrings,
+                    remove_asserts,
+                    remove_logs,
+                    sorted(comment_options.items()) if comment_options else None,
+                    sorted(log_levels) if log_levels else None,
+                ),
+            )
+            entry = cache.load(cache_dir, key)
+
+            if entry is not None:
+                cached_counts, new_code = entry
+                if new_code is not None:
+                    write_source(file_path, new_code.encode("utf-8"))
+                return cached_counts
 
-        if remove_prints:
-            print_remover = PrintRemover()
-            module = module.visit(print_remover)
-            prints_removed = print_remover.removed_count
+        # Decode ourselves, which also keeps the file's line endings intact
+        source_code = source.decode("utf-8")
 
         if remove_comments:
-            # Handle different comment removal options
-            if comment_options.get("all", False):
-                # Remove all types of comments
-                inline_remover = InlineCommentRemover(remove_all=True)
-                leading_remover = LeadingCommentRemover()
-                header_remover = HeaderCommentRemover()
-
-                module = module.visit(inline_remover)
-                comments_removed += inline_remover.removed_count
-
-                module = module.visit(leading_remover)
-                comments_removed += leading_remover.removed_count
-
-                module = module.visit(header_remover)
-                comments_removed += header_remover.removed_count
-            else:
-                # Handle individual comment types
-                if comment_options.get("inline", False):
-                    inline_remover = InlineCommentRemover(remove_all=True)
-                    module = module.visit(inline_remover)
-                    comments_removed += inline_remover.removed_count
-
-                if comment_options.get("leading", False):
-                    leading_remover = LeadingCommentRemover()
-                    module = module.visit(leading_remover)
-                    comments_removed += leading_remover.removed_count
-
-                if comment_options.get("header", False):
-                    header_remover = HeaderCommentRemover()
-                    module = module.visit(header_remover)
-                    comments_removed += header_remover.removed_count
-
-                if comment_options.get("default", False):
-                    inline_remover = InlineCommentRemover(remove_all=False)
-                    module = module.visit(inline_remover)
-                    comments_removed += inline_remover.removed_count
-
-        if remove_docstrings:
-            docstring_remover = DocstringRemover()
-            module = module.visit(docstring_remover)
-            docstrings_removed = docstring_remover.removed_count
-
-        if remove_asserts:
-            assert_remover = AssertRemover()
-            module = module.visit(assert_remover)
-            asserts_removed = assert_remover.removed_count
-
-        if remove_logs:
-            log_remover = LogRemover(log_levels)
-            module = module.visit(log_remover)
-            logs_removed = log_remover.removed_count
-
-        # Write back to file if any changes were made
-        if (
-            prints_removed > 0
-            or comments_removed > 0
-            or docstrings_removed > 0
-            or asserts_removed > 0
-            or logs_removed > 0
-        ):
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(module.code)
+            # Comments are single tokens, a tokenize pass is enough for them
+            result = fast_strip_comments(source_code, comment_options)
+        else:
+            # Whole-statement removals don't need libcst's lossless tree
+            result = fast_strip_statements(
+                source_code,
+                remove_prints=remove_prints,
+                remove_docstrings=remove_docstrings,
+                remove_asserts=remove_asserts,
+                remove_logs=remove_logs,
+                log_levels=log_levels,
+            )
+
+        if result is None:
+            from tidy.transformers import CompositeRemover
+
+            module = parse_module(source_code)
+
+            remover = CompositeRemover(
+                remove_prints=remove_prints,
+                remove_comments=remove_comments,
+                remove_docstrings=remove_docstrings,
+                remove_asserts=remove_asserts,
+                remove_logs=remove_logs,
+                comment_options=comment_options,
+                log_levels=log_levels,
+            )
+            result = module.visit(remover).code, remover.counts
+
+        new_code, counts = result
+
+        # Write back to file only if the content actually changed
+        if new_code == source_code:
+            new_code = None
+        else:
+            write_source(file_path, new_code.encode("utf-8"))
+
+        if cache_dir is not None:
+            cache.store(cache_dir, key, tuple(counts.values()), new_code)
 
     except Exception:
         # Skip files that can't be parsed or written
         pass
 
     return (
-        prints_removed,
-        comments_removed,
-        docstrings_removed,
-        asserts_removed,
-        logs_removed,
+        counts["prints"],
+        counts["comments"],
+        counts["docstrings"],
+        counts["asserts"],
+        counts["logs"],
     )
 
 
+def _init_worker(options: dict) -> None:
+    """Store the run's options in a worker."""
+    _worker_options.update(options)
+
+
+def _process_task(
+    item: tuple[str, bytes | None],
+) -> tuple[str, tuple[int, int, int, int, int]]:
+    file_path, source = item
+    return file_path, process_file(file_path, source=source, **_worker_options)
+
+
+def process_files(
+    file_paths: list[str],
+    options: dict,
+    jobs: int | None = None,
+) -> Iterator[tuple[str, tuple[int, int, int, int, int]]]:
+    """Process files with the given process_file options.
+
+    Up to jobs files are processed in parallel, one per CPU by default. Yields
+    (path, counts) pairs as soon as each file is done, which is not
+    necessarily in the order of file_paths.
+    """
+    jobs = jobs or os.cpu_count() or 1
+
+    # Read files ahead on a separate thread, so disk I/O overlaps with parsing
+    sources = read_sources(file_paths, max_pending=2 * jobs)
+
+    if jobs == 1 or len(file_paths) < MIN_FILES_FOR_POOL:
+        _init_worker(options)
+        yield from map(_process_task, sources)
+        return
+
+    # Free-threaded builds run threads in parallel, without pickling
+    # arguments and results across processes
+    free_threaded = hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled()
+    pool_class = ThreadPool if free_threaded else multiprocessing.Pool
+
+    # Enough chunks per worker to balance the load, few enough to keep IPC low
+    chunksize = max(1, len(file_paths) // (jobs * 8))
+
+    with pool_class(jobs, initializer=_init_worker, initargs=(options,)) as pool:
+        yield from pool.imap_unordered(_process_task, sources, chunksize=chunksize)
+
+
 def main() -> int:
     """Main entry point for the tidy CLI."""
     parser = argparse.ArgumentParser(
@@ -157,6 +319,18 @@ def main() -> int:
         action="store_true",
         help="Suppress per-file output (verbose is default)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write the {cache.CACHE_DIR} result cache",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="Number of files to process in parallel (default: number of CPUs)",
+    )
 
     # Comment-specific options
     parser.add_argument(
@@ -201,6 +375,10 @@ def main() -> int:
 
     args = parser.parse_args()
 
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1")
+        return 1
+
     # Validate comment options
     if args.command == "comments":
         comment_flags = {
@@ -295,16 +473,7 @@ def main() -> int:
 
         # If --all is specified, ignore other flags and use all log levels
         if args.all:
-            log_levels = {
-                "trace",
-                "debug",
-                "info",
-                "warning",
-                "success",
-                "error",
-                "exception",
-                "critical",
-            }
+            log_levels = set(LOG_LEVELS)
         # If any specific log level flags are specified, only remove those levels
         elif any(log_flags.values()):
             log_levels = {
@@ -314,8 +483,8 @@ def main() -> int:
             }
         # No need for default case since validation requires at least one flag
 
-    # Find all Python files
-    python_files = find_python_files(".")
+    # Find all Python files, upfront since the pool choice depends on the count
+    python_files = unique_files(find_python_files("."))
 
     total_prints_removed = 0
     total_comments_removed = 0
@@ -331,25 +500,31 @@ def main() -> int:
     # Verbose is default, quiet mode suppresses per-file output
     verbose_mode = not args.quiet
 
-    # Process each file
-    for file_path in python_files:
-        (
-            prints_removed,
-            comments_removed,
-            docstrings_removed,
-            asserts_removed,
-            logs_removed,
-        ) = process_file(
-            file_path,
-            remove_prints,
-            remove_comments,
-            remove_docstrings,
-            remove_asserts,
-            remove_logs,
-            comment_options,
-            log_levels,
-        )
-
+    options = {
+        "remove_prints": remove_prints,
+        "remove_comments": remove_comments,
+        "remove_docstrings": remove_docstrings,
+        "remove_asserts": remove_asserts,
+        "remove_logs": remove_logs,
+        "comment_options": comment_options,
+        "log_levels": log_levels,
+        "cache_dir": None if args.no_cache else cache.CACHE_DIR,
+    }
+
+    if not args.no_cache:
+        cache.prepare(cache.CACHE_DIR)
+
+    # Process each file, in parallel when there are enough of them, and report
+    # results as they come in
+    results = process_files(python_files, options, jobs=args.jobs)
+
+    for file_path, (
+        prints_removed,
+        comments_removed,
+        docstrings_removed,
+        asserts_removed,
+        logs_removed,
+    ) in results:
         if prints_removed > 0:
             files_with_prints += 1
             total_prints_removed += prints_removed
@@ -393,6 +568,10 @@ def main() -> int:
                 relative_path = os.path.relpath(file_path, ".")
                 print(f"{logs_removed} logs removed\t\t\033[90m{relative_path}\033[0m")
 
+    # Keep the result cache from growing without bound across runs
+    if not args.no_cache:
+        cache.prune(cache.CACHE_DIR)
+
     # Print summary
     if remove_prints:
         print(f"{total_prints_removed} prints removed from {files_with_prints} files")
@@ -1,7 +1,10 @@
 """LibCST transformers for removing print statements and comments."""
 
+from collections.abc import Callable, Sequence
+
 import libcst as cst
-from libcst import matchers as m
+
+from tidy.fast import HEADER_RE, LOG_BASES, LOG_LEVELS, PRESERVE_RE
 
 
 def remove_statement_preserve_comments(
@@ -27,16 +30,19 @@ class PrintRemover(cst.CSTTransformer):
         original_node: cst.SimpleStatementLine,
         updated_node: cst.SimpleStatementLine,
     ):
-        if (
-            len(updated_node.body) == 1
-            and isinstance(updated_node.body[0], cst.Expr)
-            and m.matches(
-                updated_node.body[0].value,
-                m.Call(func=m.Name("print")),
-            )
-        ):
-            self.removed_count += 1
-            return remove_statement_preserve_comments(original_node)
+        body = updated_node.body
+
+        # Exact type checks: libcst node classes aren't subclassed
+        if len(body) == 1 and type(body[0]) is cst.Expr:
+            call = body[0].value
+
+            if (
+                type(call) is cst.Call
+                and type(call.func) is cst.Name
+                and call.func.value == "print"
+            ):
+                self.removed_count += 1
+                return remove_statement_preserve_comments(original_node)
 
         return updated_node
 
@@ -56,9 +62,7 @@ class InlineCommentRemover(cst.CSTTransformer):
         if updated_node.comment:
             comment_text = updated_node.comment.value
 
-            if not self.remove_all and any(
-                keyword in comment_text for keyword in ["noqa", "type:", "pragma"]
-            ):
+            if not self.remove_all and PRESERVE_RE.search(comment_text):
                 return updated_node
 
             self.removed_count += 1
@@ -78,18 +82,18 @@ class LeadingCommentRemover(cst.CSTTransformer):
         original_node: cst.Module,
         updated_node: cst.Module,
     ) -> cst.Module:
-        if not updated_node.leading_lines:
+        if not updated_node.header:
             return updated_node
 
         new_lines: list[cst.EmptyLine] = []
 
-        for line in updated_node.leading_lines:
+        for line in updated_node.header:
             if isinstance(line, cst.EmptyLine) and line.comment:
                 self.removed_count += 1
                 continue
             new_lines.append(line)
 
-        return updated_node.with_changes(leading_lines=new_lines)
+        return updated_node.with_changes(header=new_lines)
 
     def leave_EmptyLine(
         self,
@@ -114,26 +118,20 @@ class HeaderCommentRemover(cst.CSTTransformer):
         original_node: cst.Module,
         updated_node: cst.Module,
     ) -> cst.Module:
-        if not updated_node.leading_lines:
+        if not updated_node.header:
             return updated_node
 
         new_lines: list[cst.EmptyLine] = []
 
-        for line in updated_node.leading_lines:
-            if isinstance(line, cst.EmptyLine) and line.comment:
-                comment_text = line.comment.value.strip().lower()
-
-                if (
-                    comment_text.startswith("#!")
-                    or "coding" in comment_text
-                    or comment_text.startswith("# vim:")
-                ):
-                    self.removed_count += 1
-                    continue
+        for line in updated_node.header:
+            comment = line.comment
+            if comment and HEADER_RE.match(comment.value):
+                self.removed_count += 1
+                continue
 
             new_lines.append(line)
 
-        return updated_node.with_changes(leading_lines=new_lines)
+        return updated_node.with_changes(header=new_lines)
 
 
 class DocstringRemover(cst.CSTTransformer):
@@ -144,8 +142,8 @@ class DocstringRemover(cst.CSTTransformer):
 
     def _strip_docstring(
         self,
-        body: list[cst.BaseStatement],
-    ) -> list[cst.BaseStatement]:
+        body: Sequence[cst.BaseStatement],
+    ) -> Sequence[cst.BaseStatement]:
         if (
             body
             and isinstance(body[0], cst.SimpleStatementLine)
@@ -163,29 +161,33 @@ class DocstringRemover(cst.CSTTransformer):
         original_node: cst.Module,
         updated_node: cst.Module,
     ) -> cst.Module:
-        return updated_node.with_changes(
-            body=self._strip_docstring(list(updated_node.body)),
-        )
+        body = self._strip_docstring(updated_node.body)
+        if body is updated_node.body:
+            return updated_node
+
+        return updated_node.with_changes(body=body)
 
     def leave_ClassDef(
         self,
         original_node: cst.ClassDef,
         updated_node: cst.ClassDef,
     ) -> cst.ClassDef:
-        new_body = updated_node.body.with_changes(
-            body=self._strip_docstring(list(updated_node.body.body)),
-        )
-        return updated_node.with_changes(body=new_body)
+        body = self._strip_docstring(updated_node.body.body)
+        if body is updated_node.body.body:
+            return updated_node
+
+        return updated_node.with_changes(body=updated_node.body.with_changes(body=body))
 
     def leave_FunctionDef(
         self,
         original_node: cst.FunctionDef,
         updated_node: cst.FunctionDef,
     ) -> cst.FunctionDef:
-        new_body = updated_node.body.with_changes(
-            body=self._strip_docstring(list(updated_node.body.body)),
-        )
-        return updated_node.with_changes(body=new_body)
+        body = self._strip_docstring(updated_node.body.body)
+        if body is updated_node.body.body:
+            return updated_node
+
+        return updated_node.with_changes(body=updated_node.body.with_changes(body=body))
 
 
 class AssertRemover(cst.CSTTransformer):
@@ -199,7 +201,9 @@ class AssertRemover(cst.CSTTransformer):
         original_node: cst.SimpleStatementLine,
         updated_node: cst.SimpleStatementLine,
     ):
-        if len(updated_node.body) == 1 and isinstance(updated_node.body[0], cst.Assert):
+        body = updated_node.body
+
+        if len(body) == 1 and type(body[0]) is cst.Assert:
             self.removed_count += 1
             return remove_statement_preserve_comments(original_node)
 
@@ -211,37 +215,130 @@ class LogRemover(cst.CSTTransformer):
 
     def __init__(self, log_levels: set[str] | None = None):
         self.removed_count = 0
-        self.log_levels = log_levels or {
-            "trace",
-            "debug",
-            "info",
-            "warning",
-            "success",
-            "error",
-            "exception",
-            "critical",
-        }
+        self.log_levels = frozenset(log_levels) if log_levels else LOG_LEVELS
 
     def leave_SimpleStatementLine(
         self,
         original_node: cst.SimpleStatementLine,
         updated_node: cst.SimpleStatementLine,
     ):
-        if (
-            len(updated_node.body) == 1
-            and isinstance(updated_node.body[0], cst.Expr)
-            and isinstance(updated_node.body[0].value, cst.Call)
-            and isinstance(updated_node.body[0].value.func, cst.Attribute)
-        ):
-            attr = updated_node.body[0].value.func
+        body = updated_node.body
+
+        if len(body) == 1 and type(body[0]) is cst.Expr:
+            call = body[0].value
+
+            if type(call) is cst.Call and type(call.func) is cst.Attribute:
+                attr = call.func
+                base = attr.value
+
+                if (
+                    type(attr.attr) is cst.Name
+                    and attr.attr.value in self.log_levels
+                    and type(base) is cst.Name
+                    and base.value in LOG_BASES
+                ):
+                    self.removed_count += 1
+                    return remove_statement_preserve_comments(original_node)
+
+        return updated_node
 
-            if (
-                isinstance(attr.attr, cst.Name)
-                and attr.attr.value in self.log_levels
-                and isinstance(attr.value, cst.Name)
-                and attr.value.value in {"log", "logger", "logging"}
-            ):
-                self.removed_count += 1
-                return remove_statement_preserve_comments(original_node)
+
+def _removed_count(remover: cst.CSTTransformer | None) -> int:
+    return remover.removed_count if remover is not None else 0
+
+
+def _chain_hooks(hooks: list[Callable]) -> Callable:
+    """Combine leave hooks, stopping once one removes or flattens the node."""
+
+    def leave(original_node: cst.CSTNode, updated_node: cst.CSTNode):
+        for hook in hooks:
+            updated_node = hook(original_node, updated_node)
+            if not isinstance(updated_node, cst.CSTNode):
+                break
 
         return updated_node
+
+    return leave
+
+
+class CompositeRemover(cst.CSTTransformer):
+    """Transformer applying every enabled removal in a single traversal."""
+
+    def __init__(
+        self,
+        remove_prints: bool = False,
+        remove_comments: bool = False,
+        remove_docstrings: bool = False,
+        remove_asserts: bool = False,
+        remove_logs: bool = False,
+        comment_options: dict | None = None,
+        log_levels: set[str] | None = None,
+    ):
+        comment_options = comment_options or {}
+        remove_all_comments = comment_options.get("all", False)
+
+        self.print_remover = PrintRemover() if remove_prints else None
+        self.assert_remover = AssertRemover() if remove_asserts else None
+        self.log_remover = LogRemover(log_levels) if remove_logs else None
+        self.docstring_remover = DocstringRemover() if remove_docstrings else None
+
+        self.inline_remover = None
+        self.leading_remover = None
+        self.header_remover = None
+
+        if remove_comments:
+            if remove_all_comments or comment_options.get("inline", False):
+                self.inline_remover = InlineCommentRemover(remove_all=True)
+            elif comment_options.get("default", False):
+                self.inline_remover = InlineCommentRemover(remove_all=False)
+
+            if remove_all_comments or comment_options.get("leading", False):
+                self.leading_remover = LeadingCommentRemover()
+
+            if remove_all_comments or comment_options.get("header", False):
+                self.header_remover = HeaderCommentRemover()
+
+        # Bind only the active rules' hooks onto the instance. libcst looks hooks
+        # up with getattr, so disabled rules cost nothing per node and a hook
+        # with a single rule is called without any dispatch in between
+        removers = {
+            "leave_SimpleStatementLine": (
+                self.print_remover,
+                self.assert_remover,
+                self.log_remover,
+            ),
+            "leave_TrailingWhitespace": (self.inline_remover,),
+            "leave_EmptyLine": (self.leading_remover,),
+            "leave_Module": (
+                self.leading_remover,
+                self.header_remover,
+                self.docstring_remover,
+            ),
+            "leave_ClassDef": (self.docstring_remover,),
+            "leave_FunctionDef": (self.docstring_remover,),
+        }
+
+        for name, candidates in removers.items():
+            hooks = [getattr(r, name) for r in candidates if r is not None]
+
+            if len(hooks) == 1:
+                setattr(self, name, hooks[0])
+            elif hooks:
+                setattr(self, name, _chain_hooks(hooks))
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """Return the number of removed items per category."""
+        comment_removers = (
+            self.inline_remover,
+            self.leading_remover,
+            self.header_remover,
+        )
+
+        return {
+            "prints": _removed_count(self.print_remover),
+            "comments": sum(_removed_count(r) for r in comment_removers),
+            "docstrings": _removed_count(self.docstring_remover),
+            "asserts": _removed_count(self.assert_remover),
+            "logs": _removed_count(self.log_remover),
+        }
@@ -0,0 +1,116 @@
+"""Tests for the on-disk result cache and its use in process_file."""
+
+import os
+
+import pytest
+
+from tidy import cache, main
+
+SOURCE = b"import os\nprint(os.name)\nx = 1\n"
+STRIPPED = b"import os\nx = 1\n"
+
+
+@pytest.fixture
+def no_parsing(monkeypatch):
+    """Fail the test if process_file parses anything."""
+
+    def fail(*args, **kwargs):
+        pytest.fail("source was parsed despite a cache hit")
+
+    monkeypatch.setattr(main, "fast_strip_statements", fail)
+    monkeypatch.setattr(main, "parse_module", fail)
+
+
+def strip_prints(path, cache_dir) -> tuple[int, int, int, int, int]:
+    return main.process_file(str(path), remove_prints=True, cache_dir=str(cache_dir))
+
+
+def test_store_load_round_trip(tmp_path):
+    key = cache.cache_key(SOURCE, ("options",))
+
+    assert cache.load(str(tmp_path), key) is None
+
+    cache.store(str(tmp_path), key, (1, 0, 0, 0, 0), "new code")
+    assert cache.load(str(tmp_path), key) == ((1, 0, 0, 0, 0), "new code")
+
+    cache.store(str(tmp_path), key, (0, 0, 0, 0, 0), None)
+    assert cache.load(str(tmp_path), key) == ((0, 0, 0, 0, 0), None)
+
+
+def test_key_depends_on_source_and_options():
+    key = cache.cache_key(SOURCE, ("options",))
+
+    assert key == cache.cache_key(SOURCE, ("options",))
+    assert key != cache.cache_key(SOURCE + b"\n", ("options",))
+    assert key != cache.cache_key(SOURCE, ("other options",))
+
+
+@pytest.mark.parametrize("contents", [b"", b"\x00garbage", b"\xfb"])
+def test_corrupt_entry_is_a_miss(tmp_path, contents):
+    key = cache.cache_key(SOURCE, ())
+    cache.store(str(tmp_path), key, (1, 0, 0, 0, 0), "new code")
+
+    with open(cache._entry_path(str(tmp_path), key), "wb") as f:
+        f.write(contents)
+
+    assert cache.load(str(tmp_path), key) is None
+
+
+def test_hit_rewrites_file_without_parsing(tmp_path, request):
+    cache_dir = tmp_path / "cache"
+    path = tmp_path / "a.py"
+    path.write_bytes(SOURCE)
+
+    assert strip_prints(path, cache_dir) == (1, 0, 0, 0, 0)
+    assert path.read_bytes() == STRIPPED
+
+    # Restore the original, the cached result is written back as is
+    path.write_bytes(SOURCE)
+    request.getfixturevalue("no_parsing")
+
+    assert strip_prints(path, cache_dir) == (1, 0, 0, 0, 0)
+    assert path.read_bytes() == STRIPPED
+
+
+def test_unchanged_entry_leaves_file_untouched(tmp_path, monkeypatch, request):
+    cache_dir = tmp_path / "cache"
+    path = tmp_path / "a.py"
+    # Passes the substring pre-filter, but has no print statement
+    source = b"obj.print(1)\n"
+    path.write_bytes(source)
+
+    assert strip_prints(path, cache_dir) == (0, 0, 0, 0, 0)
+
+    writes = []
+    monkeypatch.setattr(main, "write_source", lambda *args: writes.append(args))
+    request.getfixturevalue("no_parsing")
+
+    assert strip_prints(path, cache_dir) == (0, 0, 0, 0, 0)
+    assert writes == []
+    assert path.read_bytes() == source
+
+
+def test_prepare_ignores_cache_in_git(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache.prepare(str(cache_dir))
+
+    assert (cache_dir / ".gitignore").read_text(encoding="utf-8").endswith("*\n")
+
+
+def test_prune_evicts_least_recently_used_first(tmp_path):
+    keys = [cache.cache_key(bytes([i]), ()) for i in range(4)]
+
+    for age, key in enumerate(keys):
+        cache.store(str(tmp_path), key, (0, 0, 0, 0, 0), "x" * 1000)
+        # Older keys get older modification times
+        mtime = 1_000_000 - age * 100
+        os.utime(cache._entry_path(str(tmp_path), key), (mtime, mtime))
+
+    # A hit marks an entry as recently used
+    assert cache.load(str(tmp_path), keys[3]) is not None
+
+    entry_size = os.path.getsize(cache._entry_path(str(tmp_path), keys[0]))
+    cache.prune(str(tmp_path), max_bytes=2 * entry_size)
+
+    kept = [cache.load(str(tmp_path), key) is not None for key in keys]
+    assert kept == [True, False, False, True]
@@ -0,0 +1,187 @@
+"""Tests for the stdlib fast paths, checked against the libcst transformers."""
+
+import ast
+from pathlib import Path
+
+import libcst as cst
+import pytest
+
+from tidy.fast import fast_strip_comments, fast_strip_statements
+from tidy.transformers import CompositeRemover
+
+FIXTURES_DIR = Path(__file__).parent
+
+FIXTURE = (FIXTURES_DIR / "test.py").read_text(encoding="utf-8")
+
+SOURCES = {
+    "fixture": FIXTURE,
+    "fixture_copy": (FIXTURES_DIR / "test_copy.py").read_text(encoding="utf-8"),
+    "crlf": FIXTURE.replace("\n", "\r\n"),
+    "no_final_newline": FIXTURE.rstrip("\n"),
+    "semicolons": (
+        "import logging\n"
+        "print(1); x = 1\n"
+        "x = 2; print(x)\n"
+        "print(3);  # trailing\n"
+        "assert x; logging.info(x)\n"
+    ),
+    "backslash": (
+        "import logging\n"
+        "x = 1; \\\n"
+        "print(x)\n"
+        "y = 0; \\\n"
+        "assert y\n"
+        "z = 2; \\\n"
+        "logging.info(z)\n"
+        "if x:\n"
+        "    pass\n"
+        "w = 3  # not a continuation \\\n"
+        "print(w)\n"
+    ),
+    "emptied_blocks": (
+        "import logging\n"
+        "def f():\n"
+        '    """Only a docstring and removable statements."""\n'
+        "    print(1)\n"
+        "    assert f\n"
+        "class A:\n"
+        "    # leading comment\n"
+        '    """Docstring."""\n'
+        "if f:\n"
+        "    print(2)\n"
+        "else:\n"
+        "    logging.info(3)\n"
+        "try:\n"
+        "    print(4)\n"
+        "except ValueError:\n"
+        "    assert f\n"
+        "finally:\n"
+        "    logging.debug(5)\n"
+    ),
+    "headers": (
+        "#!/usr/bin/env python3\n"
+        "# -*- coding: utf-8 -*-\n"
+        "# vim: set ft=python:\n"
+        "# plain header comment\n"
+        "\n"
+        "x = 1  # noqa: E501\n"
+        "# coding: not a header anymore\n"
+        "y = 2  # type: int\n"
+    ),
+    "implicit_concatenation": (
+        '"module" "docstring"\n'
+        "def f():\n"
+        '    "not a" "docstring"\n'
+        "    return 1\n"
+        "class A:\n"
+        "    ('also' 'concatenated')\n"
+        "def g():\n"
+        "    '''A real docstring.'''\n"
+    ),
+}
+
+STATEMENT_OPTIONS = {
+    "prints": {"remove_prints": True},
+    "docstrings": {"remove_docstrings": True},
+    "asserts": {"remove_asserts": True},
+    "logs": {"remove_logs": True},
+    "logs_info": {"remove_logs": True, "log_levels": {"info"}},
+}
+
+COMMENT_OPTIONS = {
+    "default": {"default": True},
+    "inline": {"inline": True},
+    "leading": {"leading": True},
+    "header": {"header": True},
+    "header_default": {"header": True, "default": True},
+    "header_leading": {"header": True, "leading": True},
+    "all": {"all": True},
+}
+
+
+def remove_with_libcst(source_code: str, **options) -> tuple[str, dict[str, int]]:
+    remover = CompositeRemover(**options)
+    return cst.parse_module(source_code).visit(remover).code, remover.counts
+
+
+@pytest.mark.parametrize("options", STATEMENT_OPTIONS.values(), ids=STATEMENT_OPTIONS)
+@pytest.mark.parametrize("source_code", SOURCES.values(), ids=SOURCES)
+def test_statements_match_libcst(source_code, options):
+    result = fast_strip_statements(source_code, **options)
+
+    assert result == remove_with_libcst(source_code, **options)
+    ast.parse(result[0])
+
+
+@pytest.mark.parametrize("options", COMMENT_OPTIONS.values(), ids=COMMENT_OPTIONS)
+@pytest.mark.parametrize("source_code", SOURCES.values(), ids=SOURCES)
+def test_comments_match_libcst(source_code, options):
+    result = fast_strip_comments(source_code, options)
+
+    assert result == remove_with_libcst(
+        source_code, remove_comments=True, comment_options=options
+    )
+
+
+# libcst drops the final newline of files using lone CR line endings, so those
+# are compared against the LF result instead
+@pytest.mark.parametrize("options", STATEMENT_OPTIONS.values(), ids=STATEMENT_OPTIONS)
+def test_statements_keep_lone_cr_line_endings(options):
+    new_code, counts = fast_strip_statements(FIXTURE.replace("\n", "\r"), **options)
+    expected_code, expected_counts = fast_strip_statements(FIXTURE, **options)
+
+    assert new_code == expected_code.replace("\n", "\r")
+    assert counts == expected_counts
+
+
+@pytest.mark.parametrize("options", COMMENT_OPTIONS.values(), ids=COMMENT_OPTIONS)
+def test_comments_keep_lone_cr_line_endings(options):
+    new_code, counts = fast_strip_comments(FIXTURE.replace("\n", "\r"), options)
+    expected_code, expected_counts = fast_strip_comments(FIXTURE, options)
+
+    assert new_code == expected_code.replace("\n", "\r")
+    assert counts == expected_counts
+
+
+def test_backslash_continuations_are_kept():
+    source_code = SOURCES["backslash"]
+    new_code, counts = fast_strip_statements(
+        source_code, remove_prints=True, remove_asserts=True, remove_logs=True
+    )
+
+    # Only the print after a backslash inside a comment is removed
+    assert new_code == source_code.removesuffix("print(w)\n")
+    assert counts["prints"] == 1
+
+
+def test_emptied_blocks_get_a_pass():
+    new_code, _ = fast_strip_statements(
+        SOURCES["emptied_blocks"],
+        remove_prints=True,
+        remove_docstrings=True,
+        remove_asserts=True,
+        remove_logs=True,
+    )
+
+    assert new_code == (
+        "import logging\n"
+        "def f():\n"
+        "    pass\n"
+        "class A:\n"
+        "    pass\n"
+        "if f:\n"
+        "    pass\n"
+        "else:\n"
+        "    pass\n"
+        "try:\n"
+        "    pass\n"
+        "except ValueError:\n"
+        "    pass\n"
+        "finally:\n"
+        "    pass\n"
+    )
+
+
+def test_unparseable_source_falls_back():
+    assert fast_strip_statements("print(1\n", remove_prints=True) is None
+    assert fast_strip_comments("x = (  # c\n", {"all": True}) is None
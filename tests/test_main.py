@@ -0,0 +1,112 @@
+"""Tests for the file handling in tidy.main."""
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from tidy.main import find_python_files, process_file, process_files, unique_files
+
+SOURCE = b"import os\nprint(os.name)\nx = 1\n"
+STRIPPED = b"import os\nx = 1\n"
+
+
+def strip_prints(path) -> tuple[int, int, int, int, int]:
+    return process_file(str(path), remove_prints=True)
+
+
+def test_rewrite_keeps_hard_links(tmp_path):
+    original = tmp_path / "a.py"
+    original.write_bytes(SOURCE)
+    link = tmp_path / "hard.py"
+    os.link(original, link)
+
+    assert strip_prints(link)[0] == 1
+    assert original.read_bytes() == STRIPPED
+    assert os.path.samefile(original, link)
+
+
+def test_rewrite_goes_through_symlinks(tmp_path):
+    target = tmp_path / "real.py"
+    target.write_bytes(SOURCE)
+    link = tmp_path / "link.py"
+    link.symlink_to(target)
+
+    assert strip_prints(link)[0] == 1
+    assert link.is_symlink()
+    assert target.read_bytes() == STRIPPED
+
+
+def test_rewrite_keeps_mode(tmp_path):
+    path = tmp_path / "script.py"
+    path.write_bytes(SOURCE)
+    path.chmod(0o751)
+
+    assert strip_prints(path)[0] == 1
+    assert stat.S_IMODE(path.stat().st_mode) == 0o751
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() != 0,
+    reason="changing a file's owner requires root",
+)
+def test_rewrite_keeps_owner(tmp_path):
+    path = tmp_path / "owned.py"
+    path.write_bytes(SOURCE)
+    os.chown(path, 65534, 65534)
+
+    assert strip_prints(path)[0] == 1
+    assert (path.stat().st_uid, path.stat().st_gid) == (65534, 65534)
+    assert path.read_bytes() == STRIPPED
+
+
+def test_rewrite_in_read_only_directory(tmp_path):
+    directory = tmp_path / "locked"
+    directory.mkdir()
+    path = directory / "a.py"
+    path.write_bytes(SOURCE)
+    directory.chmod(0o555)
+
+    try:
+        assert strip_prints(path)[0] == 1
+    finally:
+        directory.chmod(0o755)
+
+    assert path.read_bytes() == STRIPPED
+
+
+def test_rewrite_shorter_content_truncates(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_bytes(SOURCE + b"print('a much longer trailing line')\n" * 20)
+
+    assert strip_prints(path)[0] == 21
+    assert path.read_bytes() == STRIPPED
+
+
+def test_linked_paths_are_processed_once(tmp_path):
+    real = tmp_path / "real"
+    real.mkdir()
+    target = real / "m.py"
+    target.write_bytes(SOURCE)
+    (tmp_path / "link.py").symlink_to(target)
+    os.link(target, tmp_path / "hard.py")
+
+    file_paths = list(find_python_files(str(tmp_path)))
+    assert len(file_paths) == 3
+
+    options = {
+        "remove_prints": True,
+        "remove_comments": False,
+        "remove_docstrings": False,
+        "remove_asserts": False,
+        "remove_logs": False,
+        "comment_options": None,
+        "log_levels": None,
+        "cache_dir": None,
+    }
+    results = dict(process_files(unique_files(file_paths), options, jobs=1))
+
+    assert [counts[0] for counts in results.values()] == [1]
+    for file_path in file_paths:
+        assert Path(file_path).read_bytes() == STRIPPED